@@ -1,8 +1,58 @@
 import os
+import sys
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import col, count, rank, desc
+from pyspark.sql.functions import broadcast, col, count, countDistinct, max, max_by, row_number, struct, desc
+from pyspark.sql.types import StructType, StructField, StringType
 from pyspark.sql.window import Window
 
+# Declared types for the columns used by the analytics, so they are not guessed from the data.
+# These are also the only columns read from the CSV and kept in the Parquet cache.
+SCHEMAS = {
+    "Primary_Person_use": StructType([
+        StructField("CRASH_ID", StringType()),
+        StructField("PRSN_TYPE_ID", StringType()),
+        StructField("PRSN_INJRY_SEV_ID", StringType()),
+        StructField("PRSN_ETHNICITY_ID", StringType()),
+        StructField("PRSN_GNDR_ID", StringType()),
+        StructField("PRSN_AIRBAG_ID", StringType()),
+        StructField("PRSN_ALC_RSLT_ID", StringType()),
+        StructField("DRVR_LIC_STATE_ID", StringType()),
+        StructField("DRVR_LIC_CLS_ID", StringType()),
+        StructField("DRVR_ZIP", StringType()),
+    ]),
+    "Units_use": StructType([
+        StructField("CRASH_ID", StringType()),
+        StructField("VEH_COLOR_ID", StringType()),
+        StructField("VEH_MAKE_ID", StringType()),
+        StructField("VEH_BODY_STYL_ID", StringType()),
+        StructField("FIN_RESP_TYPE_ID", StringType()),
+        StructField("VEH_DMAG_SCL_1_ID", StringType()),
+        StructField("VEH_DMAG_SCL_2_ID", StringType()),
+    ]),
+    "Charges_use": StructType([
+        StructField("CRASH_ID", StringType()),
+        StructField("CHARGE", StringType()),
+    ]),
+    "Damages_use": StructType([
+        StructField("CRASH_ID", StringType()),
+        StructField("DAMAGED_PROPERTY", StringType()),
+    ]),
+}
+
+# Datasets read by several analytics, kept in Spark's compressed in-memory columnar cache
+CACHED_DATASETS = ["Primary_Person_use", "Units_use", "Charges_use", "Damages_use"]
+
+ARROW_TYPES = {
+    "string": pa.string(),
+    "integer": pa.int32(),
+    "long": pa.int64(),
+    "double": pa.float64(),
+}
+
 class CarCrashAnalytics:
     """
     Class to handle car crash analytics using Spark DataFrame APIs.
@@ -19,16 +69,84 @@ class CarCrashAnalytics:
             .appName("CarCrashAnalytics") \
             .config("spark.executor.memory", "2g") \
             .config("spark.driver.memory", "2g") \
+            .config("spark.memory.fraction", "0.6") \
+            .config("spark.memory.offHeap.enabled", "true") \
+            .config("spark.memory.offHeap.size", "1g") \
+            .config("spark.serializer", "org.apache.spark.serializer.KryoSerializer") \
+            .config("spark.kryo.referenceTracking", "false") \
+            .config("spark.sql.shuffle.partitions", str((os.cpu_count() or 1) * 2)) \
+            .config("spark.sql.adaptive.enabled", "true") \
+            .config("spark.sql.adaptive.coalescePartitions.enabled", "true") \
+            .config("spark.sql.execution.arrow.pyspark.enabled", "true") \
+            .config("spark.sql.parquet.filterPushdown", "true") \
+            .config("spark.sql.inMemoryColumnarStorage.compressed", "true") \
+            .config("spark.sql.inMemoryColumnarStorage.partitionPruning", "true") \
+            .config("spark.sql.autoBroadcastJoinThreshold", "64MB") \
+            .config("spark.sql.cbo.enabled", "true") \
+            .config("spark.sql.optimizer.runtime.bloomFilter.enabled", "true") \
+            .config("spark.sql.optimizer.runtime.bloomFilter.applicationSideScanSizeThreshold", "1MB") \
+            .config("spark.sql.optimizer.runtime.bloomFilter.creationSideThreshold", "10MB") \
             .getOrCreate()
         self.data_folder = data_folder
+        self.cache_folder = os.path.join(data_folder, "parquet_cache")
         self.datasets = {}
 
     def load_datasets(self):
-        """Dynamically load all CSV files from the specified folder into memory."""
+        """Dynamically load all CSV files from the specified folder, converting each to Parquet once."""
+        os.makedirs(self.cache_folder, exist_ok=True)
         for file_path in os.listdir(self.data_folder):
             if file_path.endswith(".csv"):
                 filename = os.path.splitext(file_path)[0]
-                self.datasets[filename] = self.spark.read.csv(os.path.join(self.data_folder, file_path), header=True, inferSchema=True)
+                csv_path = os.path.join(self.data_folder, file_path)
+                cache_path = os.path.join(self.cache_folder, filename + ".parquet")
+                if self.cache_is_stale(csv_path, cache_path, SCHEMAS.get(filename)):
+                    table = self.read_csv_arrow(csv_path, SCHEMAS.get(filename))
+                    # Write beside the cache file and swap it in, so an interrupted write never looks up to date
+                    tmp_path = cache_path + ".tmp"
+                    pq.write_table(table, tmp_path, compression="snappy")
+                    os.replace(tmp_path, cache_path)
+                self.datasets[filename] = self.spark.read.parquet(cache_path)
+        # Co-partition the cached datasets on the join key so CRASH_ID joins between them need no shuffle
+        num_partitions = int(self.spark.conf.get("spark.sql.shuffle.partitions"))
+        for name in CACHED_DATASETS:
+            if name in self.datasets:
+                self.datasets[name] = self.datasets[name].repartition(num_partitions, "CRASH_ID")
+                # count() materializes the cache up front instead of on the first analytics call
+                self.datasets[name].persist(StorageLevel.MEMORY_AND_DISK).count()
+                # Column statistics let the cost-based optimizer choose join strategies from real sizes
+                self.datasets[name].createOrReplaceTempView(name)
+                columns = ", ".join(SCHEMAS[name].fieldNames())
+                self.spark.sql(f"ANALYZE TABLE {name} COMPUTE STATISTICS FOR COLUMNS {columns}")
+
+    def cache_is_stale(self, csv_path, cache_path, schema=None):
+        """Check whether the Parquet copy is missing, older than the CSV, or built with a different schema."""
+        if not os.path.exists(cache_path) or os.path.getmtime(cache_path) < os.path.getmtime(csv_path):
+            return True
+        if schema is None:
+            return False
+        expected = pa.schema([(field.name, ARROW_TYPES[field.dataType.typeName()]) for field in schema.fields])
+        try:
+            return not pq.read_schema(cache_path).equals(expected)
+        except pa.ArrowInvalid:
+            return True
+
+    def read_csv_arrow(self, path, schema=None):
+        """Read a CSV file with Arrow's native reader, keeping only the declared columns when a schema is given."""
+        column_types = {}
+        include_columns = []
+        if schema is not None:
+            column_types = {field.name: ARROW_TYPES[field.dataType.typeName()] for field in schema.fields}
+            include_columns = schema.fieldNames()
+        # Only empty fields are nulls, same as Spark's CSV reader; "NA" is a real value in this data
+        convert_options = pv.ConvertOptions(column_types=column_types, include_columns=include_columns, null_values=[""], strings_can_be_null=True)
+        table = pv.read_csv(path, convert_options=convert_options)
+        # Spark has no TIME type, so columns Arrow guessed as times are read again as plain strings
+        time_columns = [field.name for field in table.schema if pa.types.is_time(field.type)]
+        if time_columns:
+            column_types.update({name: pa.string() for name in time_columns})
+            convert_options = pv.ConvertOptions(column_types=column_types, include_columns=include_columns, null_values=[""], strings_can_be_null=True)
+            table = pv.read_csv(path, convert_options=convert_options)
+        return table
 
     def analytics_1(self):
         """Find the number of crashes where males killed > 2."""
@@ -42,17 +160,17 @@ class CarCrashAnalytics:
     def analytics_2(self):
         """How many two-wheelers are booked for crashes?"""
         df = self.datasets.get('Units_use')
-        filtered_df = df.filter((col("VEH_BODY_STYL_ID") == "MOTORCYCLE") | (col("VEH_BODY_STYL_ID") == "POLICE MOTORCYCLE"))
-        unique_df = filtered_df.dropDuplicates(['CRASH_ID'])
-        two_wheelers_crashed = unique_df.count()
+        filtered_df = df.filter(col("VEH_BODY_STYL_ID").isin("MOTORCYCLE", "POLICE MOTORCYCLE"))
+        two_wheelers_crashed = filtered_df.agg(countDistinct("CRASH_ID")).collect()[0][0]
         print(f"Number of crashes involving 2 wheelers: {two_wheelers_crashed}")
 
     def analytics_3(self):
         """Top 5 Vehicle Makes (driver died, airbags not deployed)."""
         df1 = self.datasets.get('Primary_Person_use')
         df2 = self.datasets.get('Units_use')
+        df1 = df1.filter((col("PRSN_TYPE_ID") == "DRIVER") & (col("PRSN_AIRBAG_ID") == "NOT DEPLOYED") & (col("PRSN_INJRY_SEV_ID") == "KILLED")).select("CRASH_ID")
+        df2 = df2.select("CRASH_ID", "VEH_MAKE_ID")
         df_joined = df1.join(df2, on="CRASH_ID", how="inner")
-        df_joined = df_joined.filter((col("PRSN_TYPE_ID") == "DRIVER") & (col("PRSN_AIRBAG_ID") == "NOT DEPLOYED") & (col("PRSN_INJRY_SEV_ID") == "KILLED"))
         grouped_df = df_joined.groupBy("VEH_MAKE_ID").count()
         top_5_df = grouped_df.orderBy(col("count").desc()).limit(5)
         top_5_values = [row['VEH_MAKE_ID'] for row in top_5_df.collect()]
@@ -64,19 +182,16 @@ class CarCrashAnalytics:
         df1 = self.datasets.get('Primary_Person_use')
         df2 = self.datasets.get('Charges_use')
 
-        df_joined = df1.join(df2, on="CRASH_ID", how="inner")
-        filter_df = df_joined.filter(
-            (col("DRVR_LIC_CLS_ID") != "UNLICENSED") &
-            (col("DRVR_LIC_CLS_ID") != "UNKNOWN") &
+        df1 = df1.filter(
+            ~col("DRVR_LIC_CLS_ID").isin("UNLICENSED", "UNKNOWN") &
             (col("PRSN_TYPE_ID") == "DRIVER")
-        )
-
-        hit_and_run_df = filter_df.filter(col("CHARGE").contains("HIT AND RUN"))
+        ).select("CRASH_ID")
+        df2 = df2.filter(col("CHARGE").contains("HIT AND RUN")).select("CRASH_ID")
 
-        hit_and_run_df = hit_and_run_df.dropDuplicates(['CRASH_ID'])
+        hit_and_run_df = df1.join(broadcast(df2), on="CRASH_ID", how="inner")
 
         # Count the number of distinct crashes involving vehicles with valid licenses and hit and run charges
-        no_of_vehicles = hit_and_run_df.count()
+        no_of_vehicles = hit_and_run_df.agg(countDistinct("CRASH_ID")).collect()[0][0]
         print(f"Number of vehicles involved in a crash with valid driver's license and hit and run: {no_of_vehicles}")
 
 
@@ -85,9 +200,13 @@ class CarCrashAnalytics:
         df = self.datasets.get('Primary_Person_use')
         df_filtered = df.filter((col("PRSN_GNDR_ID") != "FEMALE"))
         accidents_count_df = df_filtered.groupBy("DRVR_LIC_STATE_ID").agg(count("CRASH_ID").alias("accident_count"))
-        max_accident_state = accidents_count_df.orderBy(col("accident_count").desc()).limit(1)
-        max_accident_state_value = max_accident_state.collect()[0]["DRVR_LIC_STATE_ID"]
-        max_accident_state_count = max_accident_state.collect()[0]["accident_count"]
+        # max_by picks the top state in a single aggregation instead of a global sort
+        max_accident_state = accidents_count_df.agg(
+            max_by("DRVR_LIC_STATE_ID", "accident_count").alias("DRVR_LIC_STATE_ID"),
+            max("accident_count").alias("accident_count")
+        ).collect()[0]
+        max_accident_state_value = max_accident_state["DRVR_LIC_STATE_ID"]
+        max_accident_state_count = max_accident_state["accident_count"]
         print(f"State with highest non-female accident is: {max_accident_state_value}")
         print(f"Number of crashes: {max_accident_state_count}")
 
@@ -95,12 +214,13 @@ class CarCrashAnalytics:
         """Top 3rd to 5th Vehicle Makes causing the largest number of injuries."""
         df1 = self.datasets.get('Primary_Person_use')
         df2 = self.datasets.get('Units_use')
+        df1 = df1.filter(~col("PRSN_INJRY_SEV_ID").isin("NOT INJURED", "UNKNOWN", "NA")).select("CRASH_ID")
+        df2 = df2.select("CRASH_ID", "VEH_MAKE_ID")
         df_joined = df1.join(df2, on="CRASH_ID", how="inner")
-        df_joined = df_joined.filter((col("PRSN_INJRY_SEV_ID") != "NOT INJURED") & (col("PRSN_INJRY_SEV_ID") != "UNKNOWN") & (col("PRSN_INJRY_SEV_ID") != "NA"))
-        unique_df = df_joined.dropDuplicates(["CRASH_ID"])
-        injury_count_df = unique_df.groupBy("VEH_MAKE_ID").agg(count("CRASH_ID").alias("injury_count"))
-        sorted_df = injury_count_df.orderBy(col("injury_count").desc())
-        top_3_to_5_df = sorted_df.limit(5).subtract(sorted_df.limit(2))
+        injury_count_df = df_joined.groupBy("VEH_MAKE_ID").agg(countDistinct("CRASH_ID").alias("injury_count"))
+        # One numbered pass over the per-make counts instead of limit(5).subtract(limit(2))
+        ranked_df = injury_count_df.withColumn("rn", row_number().over(Window.orderBy(desc("injury_count"))))
+        top_3_to_5_df = ranked_df.filter(col("rn").between(3, 5)).orderBy("rn").drop("rn")
         top_3_to_5 = top_3_to_5_df.collect()
         print("Top 3rd to 5th Vehicle Makes causing the largest number of injuries including death:")
         for row in top_3_to_5:
@@ -110,11 +230,13 @@ class CarCrashAnalytics:
         """Top ethnic groups for each vehicle body type."""
         df1 = self.datasets.get('Primary_Person_use')
         df2 = self.datasets.get('Units_use')
+        df1 = df1.select("CRASH_ID", "PRSN_ETHNICITY_ID")
+        df2 = df2.filter(~col("VEH_BODY_STYL_ID").isin("UNKNOWN", "NA", "NOT REPORTED")).select("CRASH_ID", "VEH_BODY_STYL_ID")
         df_joined = df1.join(df2, on="CRASH_ID", how="inner")
-        df_joined = df_joined.filter((col("VEH_BODY_STYL_ID") != "UNKNOWN") & (col("VEH_BODY_STYL_ID") != "NA") & (col("VEH_BODY_STYL_ID") != "NOT REPORTED"))
         ethnicity_count_df = df_joined.groupBy("VEH_BODY_STYL_ID", "PRSN_ETHNICITY_ID").agg(count("CRASH_ID").alias("ethnicity_count"))
-        top_ethnic_group_df = ethnicity_count_df.withColumn("rank", rank().over(Window.partitionBy("VEH_BODY_STYL_ID").orderBy(desc("ethnicity_count"))))
-        top_ethnic_group_df = top_ethnic_group_df.filter(col("rank") == 1).drop("rank")
+        # max over (count, ethnicity) structs keeps the top group per body style without sorting each partition
+        top_ethnic_group_df = ethnicity_count_df.groupBy("VEH_BODY_STYL_ID").agg(max(struct(col("ethnicity_count"), col("PRSN_ETHNICITY_ID"))).alias("top"))
+        top_ethnic_group_df = top_ethnic_group_df.select("VEH_BODY_STYL_ID", "top.PRSN_ETHNICITY_ID", "top.ethnicity_count")
         top_ethnic_group = top_ethnic_group_df.collect()
         print("Top ethnic groups for each vehicle body type:")
         for row in top_ethnic_group:
@@ -123,42 +245,41 @@ class CarCrashAnalytics:
     def analytics_8(self):
         """Top 5 ZIP codes with alcohol as the contributing factor to a crash."""
         df = self.datasets.get('Primary_Person_use')
-        df_filtered = df.filter((col("PRSN_ALC_RSLT_ID") == "Positive") & (col("DRVR_ZIP") != "NULL"))
-        unique_df = df_filtered.dropDuplicates(["CRASH_ID"])
-        top_5_zip_codes = unique_df.groupby("DRVR_ZIP").count().orderBy(desc("count")).limit(5)
+        df_filtered = df.filter((col("PRSN_ALC_RSLT_ID") == "Positive") & col("DRVR_ZIP").isNotNull() & (col("DRVR_ZIP") != ""))
+        top_5_zip_codes = df_filtered.groupby("DRVR_ZIP").agg(countDistinct("CRASH_ID").alias("count")).orderBy(desc("count")).limit(5)
         top_5_zip_codes_list = top_5_zip_codes.collect()
         print("Top 5 ZIP codes with alcohol as the contributing factor to a crash:")
         for row in top_5_zip_codes_list:
             print(f"Driver Zip Code: {row['DRVR_ZIP']}, Count: {row['count']}")
 
     def analytics_9(self):
-      df1 = self.datasets.get('Primary_Units_use')
+      df1 = self.datasets.get('Units_use')
       df2 = self.datasets.get('Damages_use')
       allowed_rating = ["DAMAGED 5","DAMAGED 6","DAMAGED 7 HIGHEST"]
       insured  =["PROOF OF LIABILITY INSURANCE","LIABILITY INSURANCE POLICY","SURETY BOND","CERTIFICATE OF SELF-INSURANCE"]
-      df_joined = df1.join(df2, on="CRASH_ID", how="inner")
       #taking ratings of both veh_dmag_scl_1 and veh_dmag_scl_2 results in None dataframe
-      df_joined = df_joined.filter((col("DAMAGED_PROPERTY").contains("NO DAMAGE"))& (col("VEH_DMAG_SCL_1_ID").isin(allowed_rating))& (col("FIN_RESP_TYPE_ID").isin(insured)))#& (col("VEH_DMAG_SCL_2_ID").isin(allowed_rating)))
-      unique_df = df_joined.dropDuplicates(["CRASH_ID"])
-      count = unique_df.count()
+      df1 = df1.filter((col("VEH_DMAG_SCL_1_ID").isin(allowed_rating))& (col("FIN_RESP_TYPE_ID").isin(insured))).select("CRASH_ID")#& (col("VEH_DMAG_SCL_2_ID").isin(allowed_rating)))
+      df2 = df2.filter(col("DAMAGED_PROPERTY").contains("NO DAMAGE")).select("CRASH_ID")
+      df_joined = df1.join(df2, on="CRASH_ID", how="inner")
+      count = df_joined.agg(countDistinct("CRASH_ID")).collect()[0][0]
       print(f"Distinct Crash IDs where there was no damage and the car availed insurance are: {count}")
 
     def analytics_10(self):
-      df1 = self.datasets.get("df_Units_use")
-      df2 = self.datasets.get("df_Charges_use")
-      df3 = self.datasets.get("df_Primary_Person_use")
-      df_driver_offence = df3.join(df2, on="CRASH_ID", how="inner")
-      df_driver_offence = df_driver_offence.filter((col("PRSN_TYPE_ID")=="DRIVER")& (col("CHARGE").contains("SPEED")))
+      df1 = self.datasets.get("Units_use")
+      df2 = self.datasets.get("Charges_use")
+      df3 = self.datasets.get("Primary_Person_use")
+      drivers_df = df3.filter(col("PRSN_TYPE_ID")=="DRIVER").select("CRASH_ID", "DRVR_LIC_STATE_ID")
+      speeding_df = df2.filter(col("CHARGE").contains("SPEED")).select("CRASH_ID")
+      df_driver_offence = drivers_df.join(broadcast(speeding_df), on="CRASH_ID", how="inner")
 
       #finding the top 25 states with offences
       states_with_offence = df3.dropDuplicates(['CRASH_ID'])
       states_with_offence = states_with_offence.groupby("DRVR_LIC_STATE_ID").agg(count("CRASH_ID").alias("crash_count"))
-      states_with_offence = states_with_offence.filter((col("DRVR_LIC_STATE_ID")!="NA")&(col("DRVR_LIC_STATE_ID")!="Unknown")&(col("DRVR_LIC_STATE_ID")!="Other"))
+      states_with_offence = states_with_offence.filter(~col("DRVR_LIC_STATE_ID").isin("NA", "Unknown", "Other"))
       states_with_offence = states_with_offence.orderBy(desc("crash_count")).limit(25)
 
       #filtering out the crashes happening in top 25 states
-      top_25_states_list = [row["DRVR_LIC_STATE_ID"] for row in states_with_offence.collect()]
-      df_driver_offence = df_driver_offence.filter(col("DRVR_LIC_STATE_ID").isin(top_25_states_list))
+      df_driver_offence = df_driver_offence.join(broadcast(states_with_offence.select("DRVR_LIC_STATE_ID")), on="DRVR_LIC_STATE_ID", how="left_semi")
 
       #filtering the top 10 colours used by cars
       Top_10_vehicle_colors = df1.dropDuplicates(['CRASH_ID'])
@@ -166,8 +287,7 @@ class CarCrashAnalytics:
       Top_10_vehicle_colors = Top_10_vehicle_colors.orderBy(desc("crash_count")).limit(10)
 
       #filtering the crashes using with vehicles having these colours.
-      Top_10_vehicle_colors_list = [row["VEH_COLOR_ID"] for row in Top_10_vehicle_colors.collect()]
-      df1 = df1.filter(col("VEH_COLOR_ID").isin(Top_10_vehicle_colors_list))
+      df1 = df1.join(broadcast(Top_10_vehicle_colors.select("VEH_COLOR_ID")), on="VEH_COLOR_ID", how="left_semi")
 
       #joing the above two dataframes and gettign the top 5 vehicle makers
       final_df = df1.join(df_driver_offence, on="CRASH_ID", how="inner")
@@ -179,11 +299,22 @@ class CarCrashAnalytics:
       for i in top_5_vehicles_list:
         print(i)
 
+    def run_all(self):
+        """Run every analytics in sequence."""
+        for analytics in (self.analytics_1, self.analytics_2, self.analytics_3, self.analytics_4, self.analytics_5,
+                          self.analytics_6, self.analytics_7, self.analytics_8, self.analytics_9, self.analytics_10):
+            analytics()
+
 
-def menu():
+def menu(backend="spark"):
     """Command-line menu to execute car crash analytics."""
     data_folder = "./Data/"  # Folder containing the datasets
-    analytics = CarCrashAnalytics(data_folder)
+    if backend == "polars":
+        # Imported lazily so the Spark backend does not require Polars
+        from polars_crash_analysis import PolarsCarCrashAnalytics
+        analytics = PolarsCarCrashAnalytics(data_folder)
+    else:
+        analytics = CarCrashAnalytics(data_folder)
     analytics.load_datasets()
     while True:
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -198,6 +329,7 @@ def menu():
         print("8. Top 5 ZIP codes with alcohol as contributing factor")
         print("9. Count of Distinct Crash IDs where No Damaged Property was observed and Damage Levelis above 4 and car avails Insurance")
         print("10. Top 5 Vehicle Makes where drivers are charged with speeding related offences, has licensed Drivers, used top 10 used vehicle colours and has car licensed with the Top 25 states with highest number of offences")
+        print("12. Run all analytics")
 
         choice = input("Enter your choice: ")
         if choice == "1":
@@ -223,11 +355,13 @@ def menu():
         elif choice == "11":
             print("Exiting")
             break
+        elif choice == "12":
+            analytics.run_all()
         else:
             print("Invalid choice. Please try again.")
 
         input("Press Enter to continue...")
 
 if __name__ == "__main__":
-    menu()
+    menu(sys.argv[1] if len(sys.argv) > 1 else "spark")
 
@@ -0,0 +1,175 @@
+import os
+import polars as pl
+
+class PolarsCarCrashAnalytics:
+    """
+    Class to handle car crash analytics in-process using Polars lazy frames.
+
+    Mirrors CarCrashAnalytics for single-node runs, without the Spark JVM and shuffle overhead.
+
+    Attributes:
+        data_folder (str): Folder containing the CSV datasets.
+        datasets (dict): Dictionary to hold loaded datasets.
+    """
+
+    def __init__(self, data_folder):
+        """Initilize the Polars backend"""
+        self.data_folder = data_folder
+        self.datasets = {}
+
+    def load_datasets(self):
+        """Dynamically load all CSV files from the specified folder into memory."""
+        for file_path in os.listdir(self.data_folder):
+            if file_path.endswith(".csv"):
+                filename = os.path.splitext(file_path)[0]
+                # infer_schema_length=0 reads every column as a string, so no inference pass is made
+                df = pl.read_csv(os.path.join(self.data_folder, file_path), infer_schema_length=0)
+                self.datasets[filename] = df.lazy()
+
+    def analytics_1(self):
+        """Find the number of crashes where males killed > 2."""
+        df = self.datasets.get('Primary_Person_use')
+        filtered_df = df.filter((pl.col("PRSN_GNDR_ID") == "MALE") & (pl.col("PRSN_INJRY_SEV_ID") == "KILLED"))
+        grouped_df = filtered_df.group_by("CRASH_ID").agg(pl.len().alias("count"))
+        crash_count = grouped_df.filter(pl.col("count") >= 2).select(pl.len()).collect().item()
+        print(f"Number of crashes where males killed >= 2: {crash_count}")
+
+    def analytics_2(self):
+        """How many two-wheelers are booked for crashes?"""
+        df = self.datasets.get('Units_use')
+        filtered_df = df.filter(pl.col("VEH_BODY_STYL_ID").is_in(["MOTORCYCLE", "POLICE MOTORCYCLE"]))
+        two_wheelers_crashed = filtered_df.select(pl.col("CRASH_ID").n_unique()).collect().item()
+        print(f"Number of crashes involving 2 wheelers: {two_wheelers_crashed}")
+
+    def analytics_3(self):
+        """Top 5 Vehicle Makes (driver died, airbags not deployed)."""
+        df1 = self.datasets.get('Primary_Person_use')
+        df2 = self.datasets.get('Units_use')
+        df1 = df1.filter((pl.col("PRSN_TYPE_ID") == "DRIVER") & (pl.col("PRSN_AIRBAG_ID") == "NOT DEPLOYED") & (pl.col("PRSN_INJRY_SEV_ID") == "KILLED")).select("CRASH_ID")
+        df2 = df2.select("CRASH_ID", "VEH_MAKE_ID")
+        df_joined = df1.join(df2, on="CRASH_ID", how="inner")
+        grouped_df = df_joined.group_by("VEH_MAKE_ID").agg(pl.len().alias("count"))
+        top_5_df = grouped_df.sort("count", descending=True).head(5).collect()
+        top_5_values = top_5_df["VEH_MAKE_ID"].to_list()
+        print("Top 5 Vehicle Makes where airbags did not deploy and driver died are:")
+        print(top_5_values)
+
+    def analytics_4(self):
+        """Vehicles with valid license involved in hit and run."""
+        df1 = self.datasets.get('Primary_Person_use')
+        df2 = self.datasets.get('Charges_use')
+
+        # ~is_in does not drop nulls the way Spark's ~isin does, so they are excluded explicitly
+        df1 = df1.filter(
+            pl.col("DRVR_LIC_CLS_ID").is_not_null() &
+            ~pl.col("DRVR_LIC_CLS_ID").is_in(["UNLICENSED", "UNKNOWN"]) &
+            (pl.col("PRSN_TYPE_ID") == "DRIVER")
+        ).select("CRASH_ID")
+        df2 = df2.filter(pl.col("CHARGE").str.contains("HIT AND RUN", literal=True)).select("CRASH_ID")
+
+        hit_and_run_df = df1.join(df2, on="CRASH_ID", how="inner")
+
+        # Count the number of distinct crashes involving vehicles with valid licenses and hit and run charges
+        no_of_vehicles = hit_and_run_df.select(pl.col("CRASH_ID").n_unique()).collect().item()
+        print(f"Number of vehicles involved in a crash with valid driver's license and hit and run: {no_of_vehicles}")
+
+    def analytics_5(self):
+        """State with the highest non-female accidents."""
+        df = self.datasets.get('Primary_Person_use')
+        df_filtered = df.filter(pl.col("PRSN_GNDR_ID") != "FEMALE")
+        accidents_count_df = df_filtered.group_by("DRVR_LIC_STATE_ID").agg(pl.col("CRASH_ID").count().alias("accident_count"))
+        max_accident_state = accidents_count_df.sort("accident_count", descending=True).head(1).collect().row(0, named=True)
+        max_accident_state_value = max_accident_state["DRVR_LIC_STATE_ID"]
+        max_accident_state_count = max_accident_state["accident_count"]
+        print(f"State with highest non-female accident is: {max_accident_state_value}")
+        print(f"Number of crashes: {max_accident_state_count}")
+
+    def analytics_6(self):
+        """Top 3rd to 5th Vehicle Makes causing the largest number of injuries."""
+        df1 = self.datasets.get('Primary_Person_use')
+        df2 = self.datasets.get('Units_use')
+        df1 = df1.filter(pl.col("PRSN_INJRY_SEV_ID").is_not_null() & ~pl.col("PRSN_INJRY_SEV_ID").is_in(["NOT INJURED", "UNKNOWN", "NA"])).select("CRASH_ID")
+        df2 = df2.select("CRASH_ID", "VEH_MAKE_ID")
+        df_joined = df1.join(df2, on="CRASH_ID", how="inner")
+        injury_count_df = df_joined.group_by("VEH_MAKE_ID").agg(pl.col("CRASH_ID").n_unique().alias("injury_count"))
+        top_3_to_5 = injury_count_df.sort("injury_count", descending=True).slice(2, 3).collect()
+        print("Top 3rd to 5th Vehicle Makes causing the largest number of injuries including death:")
+        for row in top_3_to_5.iter_rows(named=True):
+            print(f"Vehicle Make: {row['VEH_MAKE_ID']}, Number of Injuries/Deaths: {row['injury_count']}")
+
+    def analytics_7(self):
+        """Top ethnic groups for each vehicle body type."""
+        df1 = self.datasets.get('Primary_Person_use')
+        df2 = self.datasets.get('Units_use')
+        df1 = df1.select("CRASH_ID", "PRSN_ETHNICITY_ID")
+        df2 = df2.filter(pl.col("VEH_BODY_STYL_ID").is_not_null() & ~pl.col("VEH_BODY_STYL_ID").is_in(["UNKNOWN", "NA", "NOT REPORTED"])).select("CRASH_ID", "VEH_BODY_STYL_ID")
+        df_joined = df1.join(df2, on="CRASH_ID", how="inner")
+        ethnicity_count_df = df_joined.group_by("VEH_BODY_STYL_ID", "PRSN_ETHNICITY_ID").agg(pl.col("CRASH_ID").count().alias("ethnicity_count"))
+        # Same tie-break as the Spark struct max: highest count, then the largest ethnicity value
+        top_ethnic_group_df = ethnicity_count_df.sort(["ethnicity_count", "PRSN_ETHNICITY_ID"], descending=True, nulls_last=True)
+        top_ethnic_group = top_ethnic_group_df.group_by("VEH_BODY_STYL_ID", maintain_order=True).first().collect()
+        print("Top ethnic groups for each vehicle body type:")
+        for row in top_ethnic_group.iter_rows(named=True):
+            print(f"Body Style: {row['VEH_BODY_STYL_ID']}, Top Ethnic Group: {row['PRSN_ETHNICITY_ID']}, Count: {row['ethnicity_count']}")
+
+    def analytics_8(self):
+        """Top 5 ZIP codes with alcohol as the contributing factor to a crash."""
+        df = self.datasets.get('Primary_Person_use')
+        df_filtered = df.filter((pl.col("PRSN_ALC_RSLT_ID") == "Positive") & pl.col("DRVR_ZIP").is_not_null() & (pl.col("DRVR_ZIP") != ""))
+        top_5_zip_codes = df_filtered.group_by("DRVR_ZIP").agg(pl.col("CRASH_ID").n_unique().alias("count")).sort("count", descending=True).head(5)
+        top_5_zip_codes_list = top_5_zip_codes.collect()
+        print("Top 5 ZIP codes with alcohol as the contributing factor to a crash:")
+        for row in top_5_zip_codes_list.iter_rows(named=True):
+            print(f"Driver Zip Code: {row['DRVR_ZIP']}, Count: {row['count']}")
+
+    def analytics_9(self):
+      df1 = self.datasets.get('Units_use')
+      df2 = self.datasets.get('Damages_use')
+      allowed_rating = ["DAMAGED 5","DAMAGED 6","DAMAGED 7 HIGHEST"]
+      insured  =["PROOF OF LIABILITY INSURANCE","LIABILITY INSURANCE POLICY","SURETY BOND","CERTIFICATE OF SELF-INSURANCE"]
+      df1 = df1.filter(pl.col("VEH_DMAG_SCL_1_ID").is_in(allowed_rating) & pl.col("FIN_RESP_TYPE_ID").is_in(insured)).select("CRASH_ID")
+      df2 = df2.filter(pl.col("DAMAGED_PROPERTY").str.contains("NO DAMAGE", literal=True)).select("CRASH_ID")
+      df_joined = df1.join(df2, on="CRASH_ID", how="inner")
+      count = df_joined.select(pl.col("CRASH_ID").n_unique()).collect().item()
+      print(f"Distinct Crash IDs where there was no damage and the car availed insurance are: {count}")
+
+    def analytics_10(self):
+      df1 = self.datasets.get("Units_use")
+      df2 = self.datasets.get("Charges_use")
+      df3 = self.datasets.get("Primary_Person_use")
+      drivers_df = df3.filter(pl.col("PRSN_TYPE_ID")=="DRIVER").select("CRASH_ID", "DRVR_LIC_STATE_ID")
+      speeding_df = df2.filter(pl.col("CHARGE").str.contains("SPEED", literal=True)).select("CRASH_ID")
+      df_driver_offence = drivers_df.join(speeding_df, on="CRASH_ID", how="inner")
+
+      #finding the top 25 states with offences
+      states_with_offence = df3.unique(subset=["CRASH_ID"])
+      states_with_offence = states_with_offence.group_by("DRVR_LIC_STATE_ID").agg(pl.col("CRASH_ID").count().alias("crash_count"))
+      states_with_offence = states_with_offence.filter(pl.col("DRVR_LIC_STATE_ID").is_not_null() & ~pl.col("DRVR_LIC_STATE_ID").is_in(["NA", "Unknown", "Other"]))
+      states_with_offence = states_with_offence.sort("crash_count", descending=True).head(25)
+
+      #filtering out the crashes happening in top 25 states
+      df_driver_offence = df_driver_offence.join(states_with_offence.select("DRVR_LIC_STATE_ID"), on="DRVR_LIC_STATE_ID", how="semi")
+
+      #filtering the top 10 colours used by cars
+      Top_10_vehicle_colors = df1.unique(subset=["CRASH_ID"])
+      Top_10_vehicle_colors = Top_10_vehicle_colors.group_by("VEH_COLOR_ID").agg(pl.col("CRASH_ID").count().alias("crash_count"))
+      Top_10_vehicle_colors = Top_10_vehicle_colors.sort("crash_count", descending=True).head(10)
+
+      #filtering the crashes using with vehicles having these colours.
+      df1 = df1.join(Top_10_vehicle_colors.select("VEH_COLOR_ID"), on="VEH_COLOR_ID", how="semi")
+
+      #joing the above two dataframes and gettign the top 5 vehicle makers
+      final_df = df1.join(df_driver_offence, on="CRASH_ID", how="inner")
+      final_df = final_df.unique(subset=["CRASH_ID"])
+      Top_5_vehicles = final_df.group_by("VEH_MAKE_ID").agg(pl.col("CRASH_ID").count().alias("Vehicle_count"))
+      Top_5_vehicles = Top_5_vehicles.sort("Vehicle_count", descending=True).head(5)
+      top_5_vehicles_list = Top_5_vehicles.collect()["VEH_MAKE_ID"].to_list()
+      print("Top 5 Vehicle Makes where drivers are charged with speeding related offences, has licensed Drivers, used top 10 used vehicle colours and has car licensed with the Top 25 states with highest number of offences are:")
+      for i in top_5_vehicles_list:
+        print(i)
+
+    def run_all(self):
+        """Run every analytics in sequence."""
+        for analytics in (self.analytics_1, self.analytics_2, self.analytics_3, self.analytics_4, self.analytics_5,
+                          self.analytics_6, self.analytics_7, self.analytics_8, self.analytics_9, self.analytics_10):
+            analytics()